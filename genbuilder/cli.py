@@ -2,7 +2,6 @@ import json
 from pathlib import Path
 import typer
 
-from .geo_pipeline import BuildingPipeline
 from .params import GenParams
 from .utils import setup_logging
 
@@ -15,9 +14,14 @@ def run(
     output_dir: Path = typer.Argument(..., help="Directory for generated assets"),
     texel_density: float = typer.Option(512.0, help="Texels per meter for UV atlas"),
     seed: int = typer.Option(0, help="Deterministic seed"),
-    batch_size: int = typer.Option(1, help="Not used yet; reserved for batching"),
+    batch_size: int = typer.Option(1, help="Max facades of one size denoised per diffusion call"),
+    workers: int = typer.Option(1, help="Worker processes for buildings (0 = one per CPU)"),
     device: str = typer.Option("cpu", help="Device for diffusion pipeline"),
+    cpu_offload: bool = typer.Option(False, help="Offload idle diffusion models to CPU to save VRAM (CUDA only)"),
+    quantize_unet: bool = typer.Option(False, help="Quantise UNet weights to int8 (needs optimum-quanto)"),
+    compile_unet: bool = typer.Option(False, help="Compile the UNet with torch.compile"),
     dry_run_geometry: bool = typer.Option(False, help="Skip heavy texturing; geometry only"),
+    optimize_meshes: bool = typer.Option(False, help="Reorder mesh indices for GPU vertex cache (needs meshoptimizer)"),
     city_hint: str | None = typer.Option(None, help="City or regional hint for prompts"),
     climate_hint: str | None = typer.Option(None, help="Climate hint for prompts"),
     era_hint: str | None = typer.Option(None, help="Era hint for prompts"),
@@ -26,13 +30,21 @@ def run(
     seed_hint: str | None = typer.Option(None, help="Textual seed hint for prompts"),
     recipe: str | None = typer.Option(None, help="Prompt library recipe to use"),
 ):
+    # Deferred so `--help` and argument errors don't pay for shapely/pyproj/trimesh/torch imports
+    from .geo_pipeline import BuildingPipeline
+
     setup_logging()
     params = GenParams(
         texel_density=texel_density,
         device=device,
+        cpu_offload=cpu_offload,
+        quantize_unet=quantize_unet,
+        compile_unet=compile_unet,
         seed=seed,
         batch_size=batch_size,
+        workers=workers,
         dry_run_geometry=dry_run_geometry,
+        optimize_meshes=optimize_meshes,
         city_hint=city_hint,
         climate_hint=climate_hint,
         era_hint=era_hint,
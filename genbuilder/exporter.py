@@ -1,12 +1,12 @@
-import json
 import logging
+from concurrent.futures import Executor, Future
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, List, Optional, Tuple
 
 from PIL import Image
 import numpy as np
-import trimesh
+import orjson
 
 from .geometry import Mesh
 from .utils import ensure_dir
@@ -17,34 +17,77 @@ LOGGER = logging.getLogger(__name__)
 @dataclass
 class ExportResult:
     glb_path: Path
+    # Set when the write was handed to a background writer
+    pending: Optional[Future] = None
 
 
-def export_glb(mesh: Mesh, texture_paths: Dict[str, Path], output_path: Path) -> ExportResult:
+def _split_uv_seams(
+    vertices: np.ndarray, faces: np.ndarray, uvs: np.ndarray, uv_indices: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Give every distinct (vertex, UV) corner its own output vertex.
+
+    Meshes share corner positions between walls and roof and keep UVs per face,
+    while glTF stores one UV per vertex, so positions are duplicated along UV seams only.
+    """
+
+    # float64 holds both the int32 vertex ids and the float32 UVs exactly
+    corners = np.column_stack([faces.reshape(-1), uvs[uv_indices.reshape(-1)]])
+    unique_corners, remap = np.unique(corners, axis=0, return_inverse=True)
+    source = unique_corners[:, 0].astype(np.int64)
+    return vertices[source], remap.reshape(-1, 3).astype(np.int32), unique_corners[:, 1:].astype(np.float32)
+
+
+def _optimize_vertex_order(
+    vertices: np.ndarray, faces: np.ndarray, uv: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Reorder triangles for GPU vertex-cache reuse and vertices for fetch locality."""
+
+    try:
+        import meshoptimizer
+    except ImportError:
+        LOGGER.warning("meshoptimizer is not installed; exporting mesh without vertex-cache optimisation")
+        return vertices, faces, uv
+
+    indices = faces.reshape(-1).astype(np.uint32)
+    optimized = np.empty_like(indices)
+    meshoptimizer.optimize_vertex_cache(optimized, indices, len(indices), len(vertices))
+    remap = np.empty(len(vertices), dtype=np.uint32)
+    unique = meshoptimizer.optimize_vertex_fetch_remap(remap, optimized, len(optimized), len(vertices))
+
+    used = remap != np.iinfo(np.uint32).max
+    new_vertices = np.empty((unique, 3), dtype=vertices.dtype)
+    new_vertices[remap[used]] = vertices[used]
+    new_uv = np.empty((unique, 2), dtype=uv.dtype)
+    new_uv[remap[used]] = uv[used]
+    return new_vertices, remap[optimized].reshape(-1, 3).astype(np.int32), new_uv
+
+
+def export_glb(
+    mesh: Mesh,
+    texture_paths: Dict[str, Path],
+    output_path: Path,
+    optimize: bool = False,
+    writer: Optional[Executor] = None,
+) -> ExportResult:
     if not texture_paths:
         raise ValueError("At least one texture is required to export a textured GLB")
 
-    vertices = np.array(mesh.vertices)
-    faces = np.array(mesh.faces)
+    # view() strips ndarray subclasses such as trimesh's TrackedArray
+    vertices = mesh.vertices.view(np.ndarray)
+    faces = mesh.faces.view(np.ndarray)
 
     base_color_path = texture_paths.get("baseColor")
     if base_color_path is None:
         raise ValueError("baseColor texture is required for GLB export")
 
-    uv = np.zeros((len(mesh.vertices), 2), dtype=float)
-    uv_assigned = np.zeros(len(mesh.vertices), dtype=bool)
-    if mesh.uv_indices and len(mesh.uv_indices) == len(mesh.faces):
-        for face_idx, (face, uv_idx) in enumerate(zip(mesh.faces, mesh.uv_indices)):
-            for vertex_id, uv_id in zip(face, uv_idx):
-                uv_coord = mesh.uvs[uv_id]
-                if not uv_assigned[vertex_id]:
-                    uv[vertex_id] = uv_coord
-                    uv_assigned[vertex_id] = True
-                elif not np.allclose(uv[vertex_id], uv_coord):
-                    LOGGER.warning(
-                        "Conflicting UVs for vertex %s on face %s; keeping first assignment",
-                        vertex_id,
-                        face_idx,
-                    )
+    if len(mesh.uv_indices) and len(mesh.uv_indices) == len(faces):
+        vertices, faces, uv = _split_uv_seams(vertices, faces, mesh.uvs.view(np.ndarray), mesh.uv_indices.view(np.ndarray))
+    else:
+        uv = np.zeros((len(vertices), 2), dtype=np.float32)
+    if optimize:
+        vertices, faces, uv = _optimize_vertex_order(vertices, faces, uv)
+
+    import trimesh
 
     with Image.open(base_color_path) as img:
         texture_image = img.convert("RGBA")
@@ -52,11 +95,13 @@ def export_glb(mesh: Mesh, texture_paths: Dict[str, Path], output_path: Path) ->
     tm = trimesh.Trimesh(vertices=vertices, faces=faces, visual=visuals, process=False)
 
     ensure_dir(output_path.parent)
+    if writer is not None:
+        return ExportResult(glb_path=output_path, pending=writer.submit(tm.export, output_path, file_type="glb"))
     tm.export(output_path, file_type="glb")
     return ExportResult(glb_path=output_path)
 
 
 def write_index(records: List[Dict[str, object]], output_path: Path) -> None:
     ensure_dir(output_path.parent)
-    output_path.write_text(json.dumps(records, indent=2))
+    output_path.write_bytes(orjson.dumps(records, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY))
     LOGGER.info("Index written to %s", output_path)
@@ -1,30 +1,60 @@
-import json
+from __future__ import annotations
+
 import logging
+import os
+from collections import OrderedDict, deque
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from dataclasses import replace
+from itertools import count, islice
+from multiprocessing import Manager
 from pathlib import Path
-from typing import Dict, List, Tuple
+from typing import TYPE_CHECKING, Deque, Dict, Iterable, Iterator, List, MutableMapping, Optional, Set, Tuple
 
+import ijson
+import numpy as np
+import shapely
 from tqdm import tqdm
 
 from .exporter import export_glb, write_index
 from .geometry import (
     BuildingProperties,
+    Mesh,
     PreparedGeometry,
     extrude_building,
     reproject_polygon,
+    reproject_polygons,
     select_local_crs,
     validate_polygon,
+    validate_polygons,
 )
 from .params import GenParams
 from .segmentation import SegmentationGenerator
-from .texture import TextureGenerator, TextureResult
-from .uv import UVGenerator
+from .uv import UVAtlas, UVGenerator
 from .utils import CachePaths, deterministic_seed, setup_logging
 
+if TYPE_CHECKING:
+    from .texture import TextureResult
+
 LOGGER = logging.getLogger(__name__)
 
+# GLB writes overlapped with the next building's geometry; also bounds buffered meshes
+GLB_WRITER_THREADS = 4
+# Features whose shape keys are computed together before dispatch to workers
+SCHEDULE_BATCH_SIZE = 256
+# Submitted but unfinished features per worker process before the scheduler waits
+MAX_IN_FLIGHT_PER_WORKER = 4
+# Annotated meshes kept for translated duplicates of a footprint (least recently used dropped)
+SHAPE_MESH_CACHE_SIZE = 128
+
+# Sorted bbox extents and height (m), then wall atlas width, height (px) and strip count
+ShapeKey = Tuple[float, float, float, int, int, int]
+
 
 class BuildingPipeline:
     def __init__(self, params: GenParams | None = None) -> None:
+        # The diffusion stack is only imported once a pipeline is actually built
+        from .texture import TextureGenerator
+
         self.params = params or GenParams()
         self.cache = CachePaths(self.params.cache_dir or Path(".cache"))
         self.uv_generator = UVGenerator(texel_density=self.params.texel_density)
@@ -32,11 +62,22 @@ class BuildingPipeline:
             texel_density=self.params.texel_density, config=self.params.facade_config
         )
         self.texture_generator = TextureGenerator(
-            cache_paths=self.cache, device=self.params.device, seed=self.params.seed
+            cache_paths=self.cache,
+            device=self.params.device,
+            seed=self.params.seed,
+            cpu_offload=self.params.cpu_offload,
+            quantize_unet=self.params.quantize_unet,
+            compile_unet=self.params.compile_unet,
+            batch_size=self.params.batch_size,
         )
         self.seed = self.params.seed
         self.dry_run_geometry = self.params.dry_run_geometry
-        self._shape_textures: Dict[Tuple[float, float, float], TextureResult] = {}
+        self._shape_textures: MutableMapping[ShapeKey, TextureResult] = {}
+        # Footprint (relative to its min corner) + height -> annotated mesh, atlas and origin
+        self._shape_meshes: OrderedDict[Tuple[bytes, float], Tuple[Mesh, UVAtlas, np.ndarray]] = OrderedDict()
+        self._writer: ThreadPoolExecutor | None = None
+        self._pending_writes: Deque[Tuple[str, Future]] = deque()
+        self._failed_writes: Set[str] = set()
         setup_logging()
         deterministic_seed(self.params.seed)
 
@@ -59,14 +100,23 @@ class BuildingPipeline:
             roof_material=props.get("roof_material"),
         )
 
-    def _shape_signature(self, polygon, properties: BuildingProperties) -> Tuple[float, float, float]:
+    def _shape_signature(
+        self, polygon, properties: BuildingProperties, wall_size: Tuple[int, int], wall_strips: int
+    ) -> ShapeKey:
+        # The atlas layout decides where the wall UVs sample, so shapes with the same
+        # extents but a different strip split must not share textures
         minx, miny, maxx, maxy = polygon.bounds
         width, length = sorted((maxx - minx, maxy - miny), reverse=True)
         height = properties.building_height
-        return tuple(round(value, 3) for value in (width, length, height))
+        return (*(round(value, 3) for value in (width, length, height)), *wall_size, wall_strips)
 
-    def _shape_mask_dir(self, output_dir: Path, shape_key: Tuple[float, float, float]) -> Path:
-        key_str = "_".join(f"{dim:.3f}" for dim in shape_key)
+    def _footprint_key(self, ring: np.ndarray, properties: BuildingProperties) -> Tuple[bytes, float]:
+        height = properties.building_height or properties.floors_count * properties.floor_height
+        relative = np.round(ring - ring.min(axis=0), 3)
+        return relative.tobytes(), round(height, 3)
+
+    def _shape_mask_dir(self, output_dir: Path, shape_key: ShapeKey) -> Path:
+        key_str = "_".join(f"{dim:.3f}" if isinstance(dim, float) else str(dim) for dim in shape_key)
         return output_dir / "masks" / key_str
 
     def process_feature(self, feature: Dict, output_dir: Path) -> Dict[str, object]:
@@ -77,12 +127,27 @@ class BuildingPipeline:
         LOGGER.info(
             "Extruding building %s: %s floors at %.2f m per floor", feature_id, properties.floors_count, properties.floor_height
         )
-        mesh = extrude_building(prepared.polygon, properties)
-        LOGGER.info("Mapping UVs for feature %s", feature_id)
-        atlas = self.uv_generator.map_wall_uvs(prepared.polygon, mesh)
-        mesh = self.uv_generator.annotate_mesh_uvs(mesh, atlas)
+        ring = shapely.get_coordinates(prepared.polygon.exterior)
+        origin = ring.min(axis=0)
+        mesh_key = self._footprint_key(ring, properties)
+        cached_mesh = self._shape_meshes.get(mesh_key)
+        if cached_mesh:
+            # Same footprint and height elsewhere: topology and UVs are shared, only translate
+            LOGGER.info("Reusing mesh for feature %s", feature_id)
+            self._shape_meshes.move_to_end(mesh_key)
+            base_mesh, atlas, base_origin = cached_mesh
+            offset = np.append(origin - base_origin, 0.0)
+            mesh = replace(base_mesh, vertices=base_mesh.vertices + offset)
+        else:
+            mesh = extrude_building(prepared.polygon, properties)
+            LOGGER.info("Mapping UVs for feature %s", feature_id)
+            atlas = self.uv_generator.map_wall_uvs(prepared.polygon, mesh)
+            mesh = self.uv_generator.annotate_mesh_uvs(mesh, atlas)
+            self._shape_meshes[mesh_key] = (mesh, atlas, origin)
+            if len(self._shape_meshes) > SHAPE_MESH_CACHE_SIZE:
+                self._shape_meshes.popitem(last=False)
 
-        shape_key = self._shape_signature(prepared.polygon, properties)
+        shape_key = self._shape_signature(prepared.polygon, properties, atlas.wall_size, atlas.wall_strips)
         cached_textures = self._shape_textures.get(shape_key)
         if cached_textures:
             LOGGER.info("Reusing textures for shape %s", shape_key)
@@ -93,6 +158,8 @@ class BuildingPipeline:
                 wall_size=atlas.wall_size,
                 properties={"floors_count": properties.floors_count, "floor_height": properties.floor_height},
                 output_dir=self._shape_mask_dir(output_dir, shape_key),
+                strips=atlas.wall_strips,
+                roof_rows=atlas.roof_size[1],
             )
             metadata = self.params.placeholder_metadata(properties.floors_count, properties.floor_height)
             metadata.update({"roof": properties.roof_type or "flat", "material": properties.roof_material or "default"})
@@ -106,7 +173,16 @@ class BuildingPipeline:
 
         glb_output = output_dir / f"{feature_id}.glb"
         LOGGER.info("Exporting GLB for feature %s to %s", feature_id, glb_output)
-        export_glb(mesh, {"baseColor": textures.base_color}, glb_output)
+        export = export_glb(
+            mesh,
+            {"baseColor": textures.base_color},
+            glb_output,
+            optimize=self.params.optimize_meshes,
+            writer=self._writer,
+        )
+        if export.pending is not None:
+            self._pending_writes.append((str(glb_output), export.pending))
+            self._drain_writes(GLB_WRITER_THREADS)
 
         centroid = prepared.polygon.centroid
         return {
@@ -119,26 +195,186 @@ class BuildingPipeline:
             "height": properties.building_height,
         }
 
+    def _drain_writes(self, limit: int) -> None:
+        while len(self._pending_writes) > limit:
+            glb_path, future = self._pending_writes.popleft()
+            try:
+                future.result()
+            except Exception as exc:  # noqa: BLE001
+                LOGGER.error("Failed to write %s: %s", glb_path, exc)
+                self._failed_writes.add(glb_path)
+
+    def _run_sequential(self, features: Iterable[Dict], output_dir: Path) -> List[Dict[str, object]]:
+        results: List[Dict[str, object]] = []
+        with ThreadPoolExecutor(max_workers=GLB_WRITER_THREADS, thread_name_prefix="glb-writer") as writer:
+            self._writer = writer
+            try:
+                for feature in tqdm(features, desc="Processing buildings"):
+                    feature_id = feature.get("id", "unknown")
+                    LOGGER.info("Processing feature %s", feature_id)
+                    try:
+                        record = self.process_feature(feature, output_dir)
+                        results.append(record)
+                        LOGGER.info("Finished feature %s", feature_id)
+                    except Exception as exc:  # noqa: BLE001
+                        LOGGER.error("Failed to process feature %s: %s", feature_id, exc)
+                self._drain_writes(0)
+            finally:
+                self._writer = None
+        return [record for record in results if record["glb"] not in self._failed_writes]
+
+    def _feature_shape_key(self, feature: Dict) -> Optional[ShapeKey]:
+        try:
+            prepared = self._prepare_geometry(feature)
+            properties = self._properties_from_feature(feature)
+            layout = self.uv_generator.atlas_layout(prepared.polygon, properties.building_height)
+            return self._shape_signature(prepared.polygon, properties, *layout)
+        except Exception:  # noqa: BLE001
+            # Let the worker hit (and report) the same error
+            return None
+
+    def _shape_keys(self, features: List[Dict]) -> List[Optional[ShapeKey]]:
+        """Shape signatures for a batch of features; geometry validation, reprojection and extents use array ops."""
+
+        try:
+            polygons = validate_polygons([feature.get("geometry") for feature in features])
+            valid = shapely.is_geometry(polygons)
+            polygons[valid], _ = reproject_polygons(polygons[valid])
+            props = [feature.get("properties") or {} for feature in features]
+            floors = np.array([p.get("floors_count", 1) for p in props], dtype=np.float64).astype(np.int64)
+            floor_height = np.array([p.get("floor_height", 3.0) for p in props], dtype=np.float64)
+            building_height = np.array([p.get("building_height", np.nan) for p in props], dtype=np.float64)
+            building_height = np.where(np.isnan(building_height), floors * floor_height, building_height)
+            layouts = [
+                None if polygon is None else self.uv_generator.atlas_layout(polygon, height)
+                for polygon, height in zip(polygons, building_height.tolist())
+            ]
+        except Exception:  # noqa: BLE001
+            # A malformed feature in the batch: key features one by one so only it is skipped
+            return [self._feature_shape_key(feature) for feature in features]
+
+        bounds = shapely.bounds(polygons)
+        extents = np.sort(bounds[:, 2:] - bounds[:, :2], axis=1)[:, ::-1]
+        keys = np.round(np.column_stack([extents, building_height]), 3)
+        return [
+            None if layout is None else (*key, *layout[0], layout[1]) for layout, key in zip(layouts, keys.tolist())
+        ]
+
+    def _run_parallel(self, features: Iterable[Dict], output_dir: Path, workers: int) -> List[Dict[str, object]]:
+        """Fan features out to worker processes, one texture synthesis per building shape.
+
+        Workers share the shape -> texture map. The first feature of each shape is
+        dispatched straight away; later features with the same shape are held back
+        until it finishes so they reuse its textures instead of generating them again.
+        """
+
+        records: Dict[int, Dict[str, object]] = {}
+        futures: Dict[Future, Tuple[int, str]] = {}
+        representative_of: Dict[Future, ShapeKey] = {}
+        held: Dict[ShapeKey, List[Tuple[int, Dict]]] = {}
+        progress = tqdm(desc="Processing buildings")
+        with Manager() as manager, ProcessPoolExecutor(
+            max_workers=workers, initializer=_init_worker, initargs=(self.params, manager.dict())
+        ) as executor:
+
+            def submit(position: int, feature: Dict) -> Future:
+                future = executor.submit(_process_one, feature, output_dir)
+                futures[future] = (position, feature.get("id", "unknown"))
+                return future
+
+            pending: Set[Future] = set()
+            # Duplicates released by a finished representative, waiting for a free slot
+            ready: Deque[Tuple[int, Dict]] = deque()
+            # Features parked in ``held`` or ``ready``; they count towards the in-flight limit
+            waiting = 0
+            max_in_flight = MAX_IN_FLIGHT_PER_WORKER * workers
+
+            def collect() -> None:
+                nonlocal waiting
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                pending.difference_update(done)
+                for future in done:
+                    position, feature_id = futures.pop(future)
+                    try:
+                        records[position] = future.result()
+                        LOGGER.info("Finished feature %s", feature_id)
+                    except Exception as exc:  # noqa: BLE001
+                        LOGGER.error("Failed to process feature %s: %s", feature_id, exc)
+                    progress.update()
+                    ready.extend(held.pop(representative_of.pop(future, None), []))
+                while ready and len(pending) < max_in_flight:
+                    pending.add(submit(*ready.popleft()))
+                    waiting -= 1
+
+            # Features are read batch by batch while the file is still being parsed. Reading
+            # pauses while submitted plus parked features reach the limit, so memory stays
+            # bounded. Held features always wait on a pending representative and released
+            # ones are only left over when every slot is taken, so ``pending`` is never
+            # empty while anything is parked.
+            positions = count()
+            stream = iter(features)
+            while batch := list(islice(stream, SCHEDULE_BATCH_SIZE)):
+                for position, feature, shape_key in zip(positions, batch, self._shape_keys(batch)):
+                    while len(pending) + waiting >= max_in_flight:
+                        collect()
+                    if shape_key is None:
+                        pending.add(submit(position, feature))
+                    elif shape_key in held:
+                        held[shape_key].append((position, feature))
+                        waiting += 1
+                    else:
+                        held[shape_key] = []
+                        future = submit(position, feature)
+                        representative_of[future] = shape_key
+                        pending.add(future)
+
+            while pending:
+                collect()
+        progress.close()
+        # Keep index order identical to the sequential run
+        return [records[position] for position in sorted(records)]
+
     def run(self, geojson_path: Path, output_dir: Path) -> Path:
         output_dir.mkdir(parents=True, exist_ok=True)
-        collection = json.loads(Path(geojson_path).read_text())
-        if collection.get("type") != "FeatureCollection":
+        if _collection_type(geojson_path) != "FeatureCollection":
             raise ValueError("Input must be a FeatureCollection")
-        features = collection.get("features", [])
-        LOGGER.info("Starting pipeline for %s features", len(features))
-        results: List[Dict[str, object]] = []
-        for feature in tqdm(features, desc="Processing buildings"):
-            feature_id = feature.get("id", "unknown")
-            LOGGER.info("Processing feature %s", feature_id)
-            try:
-                record = self.process_feature(feature, output_dir)
-                results.append(record)
-                LOGGER.info("Finished feature %s", feature_id)
-            except Exception as exc:  # noqa: BLE001
-                LOGGER.error("Failed to process feature %s: %s", feature_id, exc)
+        features = _iter_features(geojson_path)
+        workers = self.params.workers if self.params.workers > 0 else os.cpu_count() or 1
+        LOGGER.info("Starting pipeline for %s with %s worker(s)", geojson_path, workers)
+        if workers > 1:
+            results = self._run_parallel(features, output_dir, workers)
+        else:
+            results = self._run_sequential(features, output_dir)
         index_path = output_dir / "index.json"
         write_index(results, index_path)
         LOGGER.info("Wrote index for %s features to %s", len(results), index_path)
         return index_path
 
 
+def _collection_type(geojson_path: Path) -> str | None:
+    with open(geojson_path, "rb") as handle:
+        return next(ijson.items(handle, "type"), None)
+
+
+def _iter_features(geojson_path: Path) -> Iterator[Dict]:
+    """Stream features one at a time so large collections never sit in memory whole."""
+
+    with open(geojson_path, "rb") as handle:
+        yield from ijson.items(handle, "features.item", use_float=True)
+
+
+_WORKER_PIPELINE: BuildingPipeline | None = None
+
+
+def _init_worker(params: GenParams, shape_textures: MutableMapping) -> None:
+    """Build one pipeline per worker process so models and caches load once."""
+
+    global _WORKER_PIPELINE
+    _WORKER_PIPELINE = BuildingPipeline(params=params)
+    _WORKER_PIPELINE._shape_textures = shape_textures
+
+
+def _process_one(feature: Dict, output_dir: Path) -> Dict[str, object]:
+    if _WORKER_PIPELINE is None:
+        raise RuntimeError("Worker pipeline was not initialised")
+    return _WORKER_PIPELINE.process_feature(feature, output_dir)
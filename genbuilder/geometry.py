@@ -1,15 +1,18 @@
 import logging
 from dataclasses import dataclass
-from typing import List, Tuple
+from functools import lru_cache
+from typing import List, Sequence, Tuple
 
+import mapbox_earcut as earcut
+import numpy as np
+import shapely
 from shapely.geometry import MultiPolygon, Polygon, shape
-from shapely.ops import transform
 from pyproj import CRS, Transformer
 
 LOGGER = logging.getLogger(__name__)
 
 
-@dataclass
+@dataclass(frozen=True)
 class BuildingProperties:
     floors_count: int
     floor_height: float
@@ -18,13 +21,24 @@ class BuildingProperties:
     roof_material: str | None = None
 
 
-@dataclass
+@dataclass(frozen=True)
 class Mesh:
-    vertices: List[Tuple[float, float, float]]
-    faces: List[Tuple[int, int, int]]
-    face_labels: List[str]
-    uvs: List[Tuple[float, float]]
-    uv_indices: List[Tuple[int, int, int]]
+    """Triangle mesh stored as structure-of-arrays.
+
+    ``vertices`` is ``(V, 3) float64`` (projected metric coordinates need the
+    precision), ``faces`` and ``uv_indices`` are ``(F, 3) int32`` and ``uvs`` is
+    ``(U, 2) float32``. ``face_labels`` holds one label per face.
+
+    Meshes from :func:`extrude_building` are shared through a cache, so the
+    dataclass is frozen and its arrays read-only; derive modified meshes with
+    ``dataclasses.replace``.
+    """
+
+    vertices: np.ndarray
+    faces: np.ndarray
+    face_labels: Sequence[str]
+    uvs: np.ndarray
+    uv_indices: np.ndarray
 
 
 @dataclass
@@ -34,75 +48,168 @@ class PreparedGeometry:
 
 
 
+@lru_cache(maxsize=128)
+def _utm_crs(zone: int, south: bool) -> CRS:
+    return CRS.from_dict({"proj": "utm", "zone": zone, "south": south})
+
+
 def select_local_crs(polygon: Polygon) -> CRS:
     lon, lat = polygon.centroid.x, polygon.centroid.y
     utm_zone = int((lon + 180) / 6) + 1
     hemisphere = "north" if lat >= 0 else "south"
-    return CRS.from_dict({"proj": "utm", "zone": utm_zone, "south": hemisphere == "south"})
+    return _utm_crs(utm_zone, hemisphere == "south")
+
+
+def utm_zones(polygons: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """UTM zone number and southern-hemisphere flag for an array of WGS84 polygons."""
+    centroids = shapely.centroid(polygons)
+    zones = ((shapely.get_x(centroids) + 180) / 6).astype(np.int32) + 1
+    return zones, shapely.get_y(centroids) < 0
+
+
+def _largest_polygon(geom) -> Polygon | None:
+    # make_valid can return collections nesting multipolygons next to stray lines/points
+    parts = [part for part in shapely.get_parts(shapely.get_parts(geom)) if isinstance(part, Polygon)]
+    parts = [part for part in parts if not part.is_empty]
+    return max(parts, key=lambda g: g.area) if parts else None
 
 
 def validate_polygon(feature_geometry: dict) -> Polygon:
     geom = shape(feature_geometry)
-    if isinstance(geom, MultiPolygon):
-        geom = max(geom.geoms, key=lambda g: g.area)
-    if not isinstance(geom, Polygon):
+    if not isinstance(geom, (Polygon, MultiPolygon)):
         raise ValueError("Geometry must be Polygon or MultiPolygon")
     if not geom.is_valid:
-        LOGGER.warning("Invalid geometry, attempting fix via buffer(0)")
-        geom = geom.buffer(0)
-    if not geom.is_valid:
+        LOGGER.warning("Invalid geometry, attempting fix via make_valid")
+        geom = shapely.make_valid(geom)
+    polygon = _largest_polygon(geom)
+    if polygon is None or not polygon.is_valid:
         raise ValueError("Geometry could not be validated")
-    return geom
+    return polygon
+
+
+def validate_polygons(feature_geometries: Sequence[dict]) -> np.ndarray:
+    """Batch :func:`validate_polygon`; unusable geometries come back as ``None``.
+
+    Validity is checked with one vectorised GEOS call and only the invalid
+    subset goes through ``make_valid``.
+    """
+    geoms = np.empty(len(feature_geometries), dtype=object)
+    for i, feature_geometry in enumerate(feature_geometries):
+        try:
+            geoms[i] = shape(feature_geometry)
+        except Exception:  # noqa: BLE001
+            geoms[i] = None
+    type_ids = shapely.get_type_id(geoms)
+    usable = (type_ids == shapely.GeometryType.POLYGON) | (type_ids == shapely.GeometryType.MULTIPOLYGON)
+    invalid = usable & ~shapely.is_valid(geoms)
+    if invalid.any():
+        LOGGER.warning("%s invalid geometries, attempting fix via make_valid", int(invalid.sum()))
+        geoms[invalid] = shapely.make_valid(geoms[invalid])
+
+    polygons = np.empty(len(geoms), dtype=object)
+    simple = usable & ~invalid & (type_ids == shapely.GeometryType.POLYGON)
+    polygons[simple] = geoms[simple]
+    for i in np.flatnonzero(usable & ~simple):
+        polygons[i] = _largest_polygon(geoms[i])
+    return polygons
+
+
+@lru_cache(maxsize=64)
+def _transformer_for(target_crs_wkt: str) -> Transformer:
+    # Building a Transformer hits the PROJ database; features in the same UTM zone share one
+    return Transformer.from_crs(CRS.from_epsg(4326), CRS.from_wkt(target_crs_wkt), always_xy=True)
 
 
 def reproject_polygon(polygon: Polygon, target_crs: CRS) -> Tuple[Polygon, Transformer]:
-    transformer = Transformer.from_crs(CRS.from_epsg(4326), target_crs, always_xy=True)
-    projected = transform(transformer.transform, polygon)
+    transformer = _transformer_for(target_crs.to_wkt())
+    # One vectorised PROJ call over every ring's (N, 2) coordinate block
+    projected = shapely.transform(polygon, lambda xy: np.column_stack(transformer.transform(xy[:, 0], xy[:, 1])))
     return projected, transformer
 
 
+def reproject_polygons(polygons: np.ndarray) -> Tuple[np.ndarray, List[CRS]]:
+    """Project WGS84 polygons into their local UTM zones with one PROJ call per zone."""
+    zones, south = utm_zones(polygons)
+    projected = np.empty(len(polygons), dtype=object)
+    crs: List[CRS] = [None] * len(polygons)  # type: ignore[list-item]
+    for zone, is_south in set(zip(zones.tolist(), south.tolist())):
+        members = np.flatnonzero((zones == zone) & (south == is_south))
+        target_crs = _utm_crs(zone, is_south)
+        transformer = _transformer_for(target_crs.to_wkt())
+        projected[members] = shapely.transform(
+            polygons[members], lambda xy: np.column_stack(transformer.transform(xy[:, 0], xy[:, 1]))
+        )
+        for member in members:
+            crs[member] = target_crs
+    return projected, crs
+
+
+# Exterior edges shorter than this (metres) are dropped as degenerate
+MIN_EDGE_LENGTH = 1e-9
+
+
+def footprint_ring(polygon: Polygon) -> np.ndarray:
+    """Exterior corners as an open ``(N, 2)`` ring with zero-length edges removed.
+
+    Noisy footprints often repeat a vertex; each repeat would otherwise become a
+    zero-width wall with its own faces and UVs.
+    """
+    corners = shapely.get_coordinates(polygon.exterior)[:-1]
+    edges = np.roll(corners, -1, axis=0) - corners
+    return corners[np.hypot(edges[:, 0], edges[:, 1]) > MIN_EDGE_LENGTH]
+
+
 def extrude_building(polygon: Polygon, properties: BuildingProperties) -> Mesh:
+    return _extrude_cached(polygon.wkb, properties)
+
+
+def _read_only(array: np.ndarray) -> np.ndarray:
+    array.flags.writeable = False
+    return array
+
+
+@lru_cache(maxsize=128)
+def _extrude_cached(wkb: bytes, properties: BuildingProperties) -> Mesh:
+    polygon = shapely.from_wkb(wkb)
     height = properties.building_height or properties.floors_count * properties.floor_height
-    exterior = list(polygon.exterior.coords)
-    vertices: List[Tuple[float, float, float]] = []
-    faces: List[Tuple[int, int, int]] = []
-    uvs: List[Tuple[float, float]] = []
-    uv_indices: List[Tuple[int, int, int]] = []
-    face_labels: List[str] = []
-
-    def add_vertex(x: float, y: float, z: float) -> int:
-        vertices.append((x, y, z))
-        return len(vertices) - 1
-
-    # Walls
-    wall_labels = []
-    for idx in range(len(exterior) - 1):
-        p0 = exterior[idx]
-        p1 = exterior[idx + 1]
-        bottom0 = add_vertex(p0[0], p0[1], 0.0)
-        bottom1 = add_vertex(p1[0], p1[1], 0.0)
-        top0 = add_vertex(p0[0], p0[1], height)
-        top1 = add_vertex(p1[0], p1[1], height)
-        faces.extend(
-            [
-                (bottom0, bottom1, top1),
-                (bottom0, top1, top0),
-            ]
-        )
-        uv_indices.extend([(len(uvs), len(uvs) + 1, len(uvs) + 2), (len(uvs), len(uvs) + 2, len(uvs) + 3)])
-        uvs.extend([(0, 0), (1, 0), (1, 1), (0, 1)])
-        wall_labels.extend([f"wall_{idx}", f"wall_{idx}"])
-
-    # Roof fan triangulation around first point
-    roof_start = add_vertex(exterior[0][0], exterior[0][1], height)
-    roof_base_index = len(vertices)
-    for p in exterior[1:-1]:
-        add_vertex(p[0], p[1], height)
-    for i in range(roof_base_index, len(vertices) - 1):
-        faces.append((roof_start, i, i + 1))
-        uv_indices.append((len(uvs), len(uvs) + 1, len(uvs) + 2))
-        uvs.extend([(0.5, 0.5), (0.6, 0.5), (0.5, 0.6)])
-        face_labels.append("roof")
-
-    face_labels = wall_labels + face_labels
-    return Mesh(vertices=vertices, faces=faces, face_labels=face_labels, uvs=uvs, uv_indices=uv_indices)
+    ring = footprint_ring(polygon)
+    segments = len(ring)
+
+    # Shared corner vertices: bottom ring [0, N), top ring [N, 2N). Walls and roof
+    # index the same positions; per-face UVs stay separate via uv_indices.
+    vertices = np.empty((2 * segments, 3), dtype=np.float64)
+    vertices[:segments, :2] = ring
+    vertices[:segments, 2] = 0.0
+    vertices[segments:, :2] = ring
+    vertices[segments:, 2] = height
+
+    # Walls: one quad (bottom0, bottom1, top1, top0) per exterior segment
+    corner = np.arange(segments)
+    bottom0, bottom1 = corner, np.roll(corner, -1)
+    top0, top1 = bottom0 + segments, bottom1 + segments
+    wall_faces = np.empty((2 * segments, 3), dtype=np.int64)
+    wall_faces[0::2] = np.column_stack([bottom0, bottom1, top1])
+    wall_faces[1::2] = np.column_stack([bottom0, top1, top0])
+    base = corner * 4
+    wall_uv_indices = np.empty((2 * segments, 3), dtype=np.int64)
+    wall_uv_indices[0::2] = np.column_stack([base, base + 1, base + 2])
+    wall_uv_indices[1::2] = np.column_stack([base, base + 2, base + 3])
+    wall_uvs = np.tile([[0.0, 0.0], [1.0, 0.0], [1.0, 1.0], [0.0, 1.0]], (segments, 1))
+
+    # Roof: ear-clipping handles non-convex (L/U-shaped) footprints
+    roof_tris = earcut.triangulate_float64(ring, np.array([segments], dtype=np.uint32)).reshape(-1, 3)
+    roof_faces = roof_tris + segments
+    roof_uv_indices = roof_tris + len(wall_uvs)
+    # Planar projection of the footprint into the unit square
+    mins = ring.min(axis=0)
+    spans = ring.max(axis=0) - mins
+    roof_uvs = (ring - mins) / np.where(spans > 0, spans, 1.0)
+
+    face_labels = tuple(f"wall_{idx}" for idx in range(segments) for _ in range(2)) + ("roof",) * len(roof_tris)
+    return Mesh(
+        vertices=_read_only(vertices),
+        faces=_read_only(np.vstack([wall_faces, roof_faces]).astype(np.int32)),
+        face_labels=face_labels,
+        uvs=_read_only(np.vstack([wall_uvs, roof_uvs]).astype(np.float32)),
+        uv_indices=_read_only(np.vstack([wall_uv_indices, roof_uv_indices]).astype(np.int32)),
+    )
@@ -1,6 +1,7 @@
+import json
 import logging
 from pathlib import Path
-from typing import Tuple
+from typing import Dict, Tuple
 
 from huggingface_hub import snapshot_download
 
@@ -8,23 +9,49 @@ LOGGER = logging.getLogger(__name__)
 
 SD15_BASE_REPO = "sd-legacy/stable-diffusion-v1-5"
 CONTROLNET_REPO = "lllyasviel/sd-controlnet-canny"
+MANIFEST_NAME = ".download_manifest.json"
+
+
+def _snapshot_files(target_dir: Path) -> Dict[str, int]:
+    return {
+        path.relative_to(target_dir).as_posix(): path.stat().st_size
+        for path in target_dir.rglob("*")
+        if path.is_file() and path.name != MANIFEST_NAME and ".cache" not in path.relative_to(target_dir).parts
+    }
+
+
+def _snapshot_complete(target_dir: Path) -> bool:
+    """Check every file recorded after the last download is still present with its size."""
+    manifest_path = target_dir / MANIFEST_NAME
+    if not manifest_path.exists():
+        return False
+    try:
+        manifest: Dict[str, int] = json.loads(manifest_path.read_text())
+    except ValueError:
+        return False
+    for name, size in manifest.items():
+        path = target_dir / name
+        if not path.is_file() or path.stat().st_size != size:
+            LOGGER.warning("Model file %s is missing or truncated", path)
+            return False
+    return bool(manifest)
 
 
 def _download_if_missing(repo_id: str, target_dir: Path, allow_patterns: tuple[str, ...] | None = None) -> Path:
     target_dir.mkdir(parents=True, exist_ok=True)
-    marker = target_dir / ".download_complete"
-    if marker.exists():
+    if _snapshot_complete(target_dir):
         LOGGER.info("Model for %s already present at %s", repo_id, target_dir)
         return target_dir
 
     LOGGER.info("Downloading %s to %s", repo_id, target_dir)
+    # Resumable: files already in local_dir and up to date are not fetched again
     snapshot_download(
         repo_id=repo_id,
         local_dir=target_dir,
-        local_dir_use_symlinks=False,
         allow_patterns=allow_patterns,
+        max_workers=8,
     )
-    marker.touch()
+    (target_dir / MANIFEST_NAME).write_text(json.dumps(_snapshot_files(target_dir), indent=2, sort_keys=True))
     LOGGER.info("Finished download of %s", repo_id)
     return target_dir
 
@@ -33,7 +60,8 @@ def ensure_sd15_controlnet(model_root: Path) -> Tuple[Path, Path]:
     """Ensure SD 1.5 base and ControlNet weights exist locally.
 
     Downloads the required model snapshots into the repository's model directory
-    on first run. Subsequent invocations are skipped thanks to a local marker file.
+    on first run. Later runs check the files against the manifest written after
+    the download and resume it when anything is missing or truncated.
     """
 
     base_dir = model_root / "sd-1.5-pruned-emaonly"
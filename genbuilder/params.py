@@ -10,9 +10,17 @@ class GenParams:
 
     texel_density: float = 512.0
     seed: int = 0
+    # Max facades of one control-image size sent through the diffusion pipeline per call
     batch_size: int = 1
+    workers: int = 1
     device: str = "cpu"
+    # Offload idle diffusion sub-models to CPU between steps (CUDA only, lower VRAM)
+    cpu_offload: bool = False
+    # int8 UNet weights (needs optimum-quanto) and torch.compile of the UNet
+    quantize_unet: bool = False
+    compile_unet: bool = False
     dry_run_geometry: bool = False
+    optimize_meshes: bool = False
     cache_dir: Path | None = None
     facade_config: FacadeMaskConfig = field(default_factory=FacadeMaskConfig)
     # Prompt placeholder hints (optional)
@@ -4,9 +4,9 @@ from pathlib import Path
 from typing import Dict, Tuple
 
 import numpy as np
-from PIL import Image, ImageDraw
+from PIL import Image
 
-from .utils import ensure_dir, clamp
+from .utils import ensure_dir
 
 LOGGER = logging.getLogger(__name__)
 
@@ -33,53 +33,97 @@ class SegmentationGenerator:
         self.texel_density = texel_density
         self.config = config or FacadeMaskConfig()
 
-    def _blank_mask(self, size: Tuple[int, int]) -> Image.Image:
-        return Image.new("L", size, 0)
-
-    def generate(self, wall_size: Tuple[int, int], properties: Dict[str, float], output_dir: Path) -> MaskBundle:
-        width, height = wall_size
-        ensure_dir(output_dir)
-
-        plinth_mask = self._blank_mask((width, height))
-        floor_mask = self._blank_mask((width, height))
-        opening_mask = self._blank_mask((width, height))
+    def _blank_masks(self, size: Tuple[int, int]) -> np.ndarray:
+        """Return one (3, H, W) planar stack holding the plinth, floors and openings masks."""
+        width, height = size
+        return np.zeros((3, height, width), dtype=np.uint8)
+
+    @staticmethod
+    def _span(start: int, end: int, size: int) -> slice:
+        """Slice covering the inclusive range [start, end] clipped to [0, size)."""
+        return slice(max(start, 0), min(max(end + 1, 0), size))
+
+    @staticmethod
+    def _span_mask(starts: np.ndarray, ends: np.ndarray, size: int) -> np.ndarray:
+        """Boolean mask of positions in [0, size) covered by any inclusive range [start, end]."""
+        positions = np.arange(size)
+        return ((positions >= starts[:, None]) & (positions <= ends[:, None])).any(axis=0)
+
+    @classmethod
+    def _fill_rect(cls, mask: np.ndarray, x0: int, y0: int, x1: int, y1: int, value: int) -> None:
+        """Fill the inclusive box [x0, x1] x [y0, y1] like ``ImageDraw.rectangle``, clipped to the mask."""
+        height, width = mask.shape
+        mask[cls._span(y0, y1, height), cls._span(x0, x1, width)] = value
+
+    def _rasterize(self, width: int, height: int, properties: Dict[str, float]) -> np.ndarray:
+        """Plinth, floors and openings planes for one full-height facade band."""
+        masks = self._blank_masks((width, height))
+        # Contiguous planes: every band write below is a dense row-major store
+        plinth_mask, floor_mask, opening_mask = masks
 
         plinth_px = int(self.config.plinth_height * self.texel_density)
-        ImageDraw.Draw(plinth_mask).rectangle([(0, height - plinth_px), (width, height)], fill=255)
+        self._fill_rect(plinth_mask, 0, height - plinth_px, width, height, 255)
 
         floor_height_px = int(properties["floor_height"] * self.texel_density)
         floors_count = int(properties["floors_count"])
-        draw_floors = ImageDraw.Draw(floor_mask)
-        for i in range(floors_count):
-            y_top = clamp(height - (i + 1) * floor_height_px, 0, height)
-            y_bottom = clamp(height - i * floor_height_px, 0, height)
-            draw_floors.rectangle([(0, y_top), (width, y_bottom)], fill=int(255 * (i % 2 == 0)))
+        if floors_count > 0 and floor_height_px > 0:
+            # Floor i spans the inclusive rows [H - (i+1)*fh, H - i*fh] and later floors
+            # overwrite shared boundary rows, so row r belongs to floor (H - r) // fh.
+            # Floors above the wall all collapse onto row 0, which the top floor owns.
+            depth = height - np.arange(height)
+            owner = np.minimum(depth // floor_height_px, floors_count - 1)
+            owner[0] = floors_count - 1
+            stripes = (depth <= floors_count * floor_height_px) & (owner % 2 == 0)
+            floor_mask[...] = (stripes.astype(np.uint8) * 255)[:, None]
 
         # Openings grid
-        draw_openings = ImageDraw.Draw(opening_mask)
         window_w_px = int(self.config.window_width * self.texel_density)
         window_h_px = int(self.config.window_height * self.texel_density)
         margin_x = int(self.config.horizontal_margin * self.texel_density)
         margin_y = int(self.config.vertical_margin * self.texel_density)
 
-        y = height - floor_height_px + margin_y
-        for floor in range(floors_count):
-            x = margin_x
-            while x + window_w_px < width - margin_x:
-                draw_openings.rectangle(
-                    [(x, y - window_h_px), (x + window_w_px, y)],
-                    fill=255,
-                )
-                x += window_w_px + margin_x
-            y -= floor_height_px
+        # Window columns repeat on every floor and window rows on every column, so
+        # the grid is the outer product of one column mask and one row mask.
+        xs = np.arange(margin_x, width - margin_x - window_w_px, max(window_w_px + margin_x, 1))
+        ys = height - floor_height_px * np.arange(1, floors_count + 1) + margin_y
+        window_cols = self._span_mask(xs, xs + window_w_px, width)
+        window_rows = self._span_mask(ys - window_h_px, ys, height)
+        opening_mask[np.ix_(window_rows, window_cols)] = 255
+        return masks
+
+    def generate(
+        self,
+        wall_size: Tuple[int, int],
+        properties: Dict[str, float],
+        output_dir: Path,
+        strips: int = 1,
+        roof_rows: int = 0,
+    ) -> MaskBundle:
+        """Rasterise the facade masks for a wall atlas of ``strips`` stacked facade bands.
+
+        The top ``roof_rows`` rows are left blank for the roof's planar UVs.
+        """
+        width, height = wall_size
+        ensure_dir(output_dir)
+
+        if strips == 1 and not roof_rows:
+            masks = self._rasterize(width, height, properties)
+        else:
+            # Every band is the same full-height facade; the roof band and any
+            # leftover rows stay blank at the top
+            band_height = (height - roof_rows) // strips
+            band = self._rasterize(width, band_height, properties)
+            masks = self._blank_masks((width, height))
+            masks[:, height - strips * band_height :] = np.tile(band, (1, strips, 1))
 
         plinth_path = output_dir / "plinth.png"
         floors_path = output_dir / "floors.png"
         openings_path = output_dir / "openings.png"
 
-        plinth_mask.save(plinth_path)
-        floor_mask.save(floors_path)
-        opening_mask.save(openings_path)
+        # Masks are strictly 0/255: store them as 1-bit PNGs. Long constant runs make
+        # maximum deflate only marginally slower than level 1 but ~3-4x smaller.
+        for mask, path in zip(masks, (plinth_path, floors_path, openings_path)):
+            Image.fromarray(mask).convert("1", dither=Image.Dither.NONE).save(path, optimize=False, compress_level=9)
 
         LOGGER.debug("Facade masks saved to %s", output_dir)
         return MaskBundle(plinth=plinth_path, floors=floors_path, openings=openings_path)
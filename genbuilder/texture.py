@@ -1,18 +1,22 @@
+from __future__ import annotations
+
 import logging
+from collections import defaultdict
 from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, Optional
+from typing import TYPE_CHECKING, Dict, List, Optional, Sequence, Tuple
 
-from PIL import Image, ImageDraw
+from PIL import Image, ImageDraw, ImageFont
 import numpy as np
 
-import torch
-from diffusers import ControlNetModel, StableDiffusionControlNetPipeline, UniPCMultistepScheduler
-
 from .model_downloader import ensure_sd15_controlnet
 from .prompt_library import PromptLibrary
 from .segmentation import MaskBundle
-from .utils import CachePaths, sha256_of_dict
+from .utils import CachePaths, digest_of_dict
+
+if TYPE_CHECKING:
+    from diffusers import StableDiffusionControlNetPipeline
 
 LOGGER = logging.getLogger(__name__)
 
@@ -27,6 +31,17 @@ class TextureResult:
 TEXTURE_CACHE_VERSION = "no-placeholder"
 
 
+@lru_cache(maxsize=1)
+def _default_font() -> ImageFont.ImageFont:
+    return ImageFont.load_default()
+
+
+@lru_cache(maxsize=8)
+def _load_library(path: str, mtime: float) -> PromptLibrary:
+    """Parse the prompt library once per ``(path, mtime)``; editing the file invalidates it."""
+    return PromptLibrary.from_file(Path(path))
+
+
 class TextureGenerator:
     def __init__(
         self,
@@ -34,20 +49,31 @@ class TextureGenerator:
         device: str = "cpu",
         seed: int = 0,
         prompt_library_path: Path | None = None,
+        cpu_offload: bool = False,
+        quantize_unet: bool = False,
+        compile_unet: bool = False,
+        batch_size: int = 1,
     ):
         self.cache_paths = cache_paths
         self.device = device
+        # Upper bound on facades denoised together in one pipeline call
+        self.batch_size = max(batch_size, 1)
+        self.cpu_offload = cpu_offload
+        self.quantize_unet = quantize_unet
+        self.compile_unet = compile_unet
         self.seed = seed
         default_library = Path(__file__).resolve().parents[1] / "tex_prompts.yaml"
         self.prompt_library_path = prompt_library_path or default_library
         self.prompt_library = self._load_prompt_library()
-        self.model_paths = ensure_sd15_controlnet(self.cache_paths.model_dir())
+        self.model_paths = ensure_sd15_controlnet(self.cache_paths.model_dir)
         self._pipeline: StableDiffusionControlNetPipeline | None = None
 
     def _load_prompt_library(self) -> Optional[PromptLibrary]:
         if self.prompt_library_path.exists():
             try:
-                library = PromptLibrary.from_file(self.prompt_library_path)
+                library = _load_library(
+                    str(self.prompt_library_path), self.prompt_library_path.stat().st_mtime
+                )
                 LOGGER.info(
                     "Loaded prompt library from %s with recipes: %s",
                     self.prompt_library_path,
@@ -76,13 +102,18 @@ class TextureGenerator:
     def _placeholder_texture(self, size: tuple[int, int], label: str) -> Image.Image:
         img = Image.new("RGB", size, (180, 180, 180))
         draw = ImageDraw.Draw(img)
-        draw.text((10, 10), label, fill=(255, 255, 255))
+        draw.text((10, 10), label, fill=(255, 255, 255), font=_default_font())
         return img
 
     def _load_pipeline(self) -> StableDiffusionControlNetPipeline:
         if self._pipeline is not None:
             return self._pipeline
 
+        # torch/diffusers are only needed for actual generation; importing them
+        # here keeps cache hits and dry runs free of the CUDA start-up cost.
+        import torch
+        from diffusers import ControlNetModel, StableDiffusionControlNetPipeline, UniPCMultistepScheduler
+
         base_path, controlnet_path = self.model_paths
         dtype = torch.float16 if self.device.startswith("cuda") else torch.float32
         controlnet = ControlNetModel.from_pretrained(controlnet_path, torch_dtype=dtype)
@@ -94,10 +125,43 @@ class TextureGenerator:
             requires_safety_checker=False,
         )
         pipeline.scheduler = UniPCMultistepScheduler.from_config(pipeline.scheduler.config)
-        pipeline.to(self.device)
+        # Wall strips are wide; decode the latents in tiles/slices to bound VAE memory
+        pipeline.enable_vae_slicing()
+        pipeline.enable_vae_tiling()
+        if self.device.startswith("cuda"):
+            try:
+                from diffusers.models.attention_processor import AttnProcessor2_0
+
+                pipeline.unet.set_attn_processor(AttnProcessor2_0())
+                pipeline.controlnet.set_attn_processor(AttnProcessor2_0())
+            except Exception as exc:  # noqa: BLE001
+                LOGGER.warning("Scaled-dot-product attention unavailable (%s)", exc)
+        if self.cpu_offload and self.device.startswith("cuda"):
+            # Keeps only the active sub-model on the GPU; manages device placement itself
+            pipeline.enable_model_cpu_offload()
+        else:
+            pipeline.to(self.device)
+        self._optimize_unet(pipeline)
         self._pipeline = pipeline
         return pipeline
 
+    def _optimize_unet(self, pipeline: StableDiffusionControlNetPipeline) -> None:
+        """Opt-in int8 weight quantisation and torch.compile for the denoising UNet."""
+
+        if self.quantize_unet:
+            try:
+                from optimum.quanto import freeze, qint8, quantize
+            except ImportError:
+                LOGGER.warning("optimum-quanto is not installed; running the UNet without int8 weights")
+            else:
+                quantize(pipeline.unet, weights=qint8)
+                freeze(pipeline.unet)
+        if self.compile_unet:
+            import torch
+
+            mode = "reduce-overhead" if self.device.startswith("cuda") else "default"
+            pipeline.unet = torch.compile(pipeline.unet, mode=mode, fullgraph=False)
+
     def _build_prompt(self, recipe: str, metadata: Dict[str, str]) -> str:
         if self.prompt_library and self.prompt_library.has_recipe(recipe):
             try:
@@ -113,67 +177,110 @@ class TextureGenerator:
         return f"Facade texture, recipe {recipe}"
 
     def _compose_control_image(self, masks: MaskBundle) -> Image.Image:
-        plinth = Image.open(masks.plinth).convert("L")
-        floors = Image.open(masks.floors).convert("L")
-        openings = Image.open(masks.openings).convert("L")
-
-        combined = np.maximum(np.array(plinth), np.array(floors))
-        combined = np.maximum(combined, np.array(openings))
+        plinth, floors, openings = (
+            np.asarray(Image.open(path).convert("L")) for path in (masks.plinth, masks.floors, masks.openings)
+        )
+        combined = np.empty_like(plinth)
+        np.maximum(plinth, floors, out=combined)
+        np.maximum(combined, openings, out=combined)
         control = Image.fromarray(combined).convert("RGB")
         return control
 
     def synthesize_facade(
         self, wall_size: tuple[int, int], masks: MaskBundle, metadata: Dict[str, str], dry_run: bool = False
     ) -> TextureResult:
-        recipe = self._select_recipe(metadata)
-        prompt_context = {"recipe": recipe, **metadata}
-        cache_key = sha256_of_dict(
-            {
-                "wall": wall_size,
-                "meta": prompt_context,
-                "version": TEXTURE_CACHE_VERSION,
-            }
-        )
-        base_path = self.cache_paths.texture_dir() / f"base_{cache_key}.png"
-        roughness_path = self.cache_paths.texture_dir() / f"roughness_{cache_key}.png"
-        normal_path = self.cache_paths.texture_dir() / f"normal_{cache_key}.png"
+        return self.synthesize_facades_batch([(wall_size, masks, metadata)], dry_run=dry_run)[0]
 
-        if base_path.exists() and roughness_path.exists() and normal_path.exists():
-            LOGGER.info("Using cached textures for %s", cache_key)
-            return TextureResult(base_color=base_path, roughness=roughness_path, normal=normal_path)
+    def synthesize_facades_batch(
+        self,
+        items: Sequence[Tuple[tuple[int, int], MaskBundle, Dict[str, str]]],
+        dry_run: bool = False,
+    ) -> List[TextureResult]:
+        """Synthesize textures for several ``(wall_size, masks, metadata)`` facades.
+
+        Cache hits are returned without touching the model; misses that share a
+        control-image size go through the pipeline in batches of up to ``batch_size``.
+        """
+
+        results: Dict[int, TextureResult] = {}
+        # cache key -> (prompt, masks, result slots waiting for it)
+        misses: Dict[str, Tuple[str, MaskBundle, List[int]]] = {}
+        for slot, (wall_size, masks, metadata) in enumerate(items):
+            recipe = self._select_recipe(metadata)
+            prompt_context = {"recipe": recipe, **metadata}
+            cache_key = digest_of_dict(
+                {
+                    "wall": wall_size,
+                    "meta": prompt_context,
+                    "version": TEXTURE_CACHE_VERSION,
+                }
+            )
+            texture = self._texture_paths(cache_key)
+            if all(path.exists() for path in (texture.base_color, texture.roughness, texture.normal)):
+                LOGGER.info("Using cached textures for %s", cache_key)
+                results[slot] = texture
+            elif cache_key in misses:
+                misses[cache_key][2].append(slot)
+            else:
+                misses[cache_key] = (self._build_prompt(recipe, prompt_context), masks, [slot])
 
-        if dry_run:
+        if misses and dry_run:
             raise RuntimeError(
                 "Texture synthesis requested in dry-run mode; real model generation is required now that placeholders are removed."
             )
 
-        pipeline = self._load_pipeline()
-        prompt = self._build_prompt(recipe, prompt_context)
-        control_image = self._compose_control_image(masks)
+        groups: Dict[Tuple[int, int], List[Tuple[str, str, Image.Image]]] = defaultdict(list)
+        for cache_key, (prompt, masks, _) in misses.items():
+            control_image = self._compose_control_image(masks)
+            groups[control_image.size].append((cache_key, prompt, control_image))
+
+        size = self.batch_size
+        batches = (group[start : start + size] for group in groups.values() for start in range(0, len(group), size))
+        for batch in batches:
+            for cache_key, base_image in zip((key for key, _, _ in batch), self._run_pipeline(batch)):
+                texture = self._save_textures(cache_key, base_image)
+                for slot in misses[cache_key][2]:
+                    results[slot] = texture
+        return [results[slot] for slot in range(len(items))]
+
+    def _texture_paths(self, cache_key: str) -> TextureResult:
+        texture_dir = self.cache_paths.texture_dir
+        return TextureResult(
+            base_color=texture_dir / f"base_{cache_key}.png",
+            roughness=texture_dir / f"roughness_{cache_key}.png",
+            normal=texture_dir / f"normal_{cache_key}.png",
+        )
 
-        generator = torch.Generator(device=self.device).manual_seed(self.seed)
+    def _run_pipeline(self, batch: List[Tuple[str, str, Image.Image]]) -> List[Image.Image]:
+        import torch
+
+        pipeline = self._load_pipeline()
+        # One generator per image so each facade matches its unbatched result
+        generators = [torch.Generator(device=self.device).manual_seed(self.seed) for _ in batch]
         result = pipeline(
-            prompt=prompt,
-            image=control_image,
+            prompt=[prompt for _, prompt, _ in batch],
+            image=[control_image for _, _, control_image in batch],
             num_inference_steps=20,
             guidance_scale=5.0,
-            generator=generator,
+            generator=generators,
         )
+        return list(result.images)
 
-        base_image: Image.Image = result.images[0]
-        roughness_image = Image.new("L", base_image.size, 128)
-        normal_image = Image.merge(
-            "RGB",
-            (
-                Image.new("L", base_image.size, 128),
-                Image.new("L", base_image.size, 128),
-                Image.new("L", base_image.size, 255),
-            ),
-        )
+    def _save_textures(self, cache_key: str, base_image: Image.Image) -> TextureResult:
+        texture = self._texture_paths(cache_key)
+        width, height = base_image.size
+        # Flat maps built straight from NumPy buffers (no per-channel images + merge)
+        roughness = np.full((height, width), 128, dtype=np.uint8)
+        normal = np.empty((height, width, 3), dtype=np.uint8)
+        normal[..., :2] = 128
+        normal[..., 2] = 255
+        roughness_image = Image.frombuffer("L", (width, height), roughness, "raw", "L", 0, 1)
+        normal_image = Image.frombuffer("RGB", (width, height), normal, "raw", "RGB", 0, 1)
 
-        base_image.save(base_path)
-        roughness_image.save(roughness_path)
-        normal_image.save(normal_path)
+        # Cache files favour encode speed over size
+        base_image.save(texture.base_color, optimize=False, compress_level=1)
+        roughness_image.save(texture.roughness, optimize=False, compress_level=1)
+        normal_image.save(texture.normal, optimize=False, compress_level=1)
 
         LOGGER.info("Generated textures using ControlNet pipeline for %s", cache_key)
-        return TextureResult(base_color=base_path, roughness=roughness_path, normal=normal_path)
+        return texture
@@ -1,24 +1,28 @@
 import hashlib
-import json
 import logging
 import os
 import random
 from dataclasses import dataclass
+from functools import cached_property
 from pathlib import Path
 from typing import Any, Dict
 
 import numpy as np
+import orjson
 
 
 @dataclass
 class CachePaths:
     base_dir: Path
 
+    # Created on first access only; later lookups skip the mkdir syscalls
+    @cached_property
     def texture_dir(self) -> Path:
         d = self.base_dir / "textures"
         d.mkdir(parents=True, exist_ok=True)
         return d
 
+    @cached_property
     def model_dir(self) -> Path:
         d = self.base_dir / "models"
         d.mkdir(parents=True, exist_ok=True)
@@ -37,9 +41,13 @@ def deterministic_seed(seed: int) -> None:
     np.random.seed(seed)
 
 
-def sha256_of_dict(data: Dict[str, Any]) -> str:
-    payload = json.dumps(data, sort_keys=True).encode("utf-8")
-    return hashlib.sha256(payload).hexdigest()
+def digest_of_dict(data: Dict[str, Any]) -> str:
+    """Stable 64-hex-digit content key of a JSON-like mapping."""
+    # Not memoised: building a hashable key for an lru_cache costs more than
+    # serialising and hashing the mapping outright
+    payload = orjson.dumps(data, option=orjson.OPT_SORT_KEYS)
+    # Cache keys need no cryptographic strength; BLAKE2b is faster than SHA-256 on 64-bit CPUs
+    return hashlib.blake2b(payload, digest_size=32, usedforsecurity=False).hexdigest()
 
 
 def ensure_dir(path: Path) -> Path:
@@ -1,12 +1,11 @@
 import logging
-from collections import defaultdict
-from dataclasses import dataclass
-from typing import Dict, List, Tuple
+from dataclasses import dataclass, replace
+from typing import Tuple
 
 import numpy as np
 from shapely.geometry import Polygon
 
-from .geometry import Mesh
+from .geometry import Mesh, footprint_ring
 
 LOGGER = logging.getLogger(__name__)
 
@@ -14,9 +13,30 @@ LOGGER = logging.getLogger(__name__)
 @dataclass
 class UVAtlas:
     wall_size: Tuple[int, int]
+    # (4 * walls, 2) float32, four corners per wall segment
+    wall_uvs: np.ndarray
+    # (V, 2) float32, one planar UV per mesh vertex
+    roof_uvs: np.ndarray
+    # Exterior wall segments laid out along the strips
+    wall_segments: int
+    # Full-height facade strips stacked vertically in the wall atlas (strip 0 at v = 0)
+    wall_strips: int
+    # Roof region (px) in the top-left corner of the atlas, above the strips
     roof_size: Tuple[int, int]
-    wall_uvs: List[Tuple[float, float]]
-    roof_uvs: List[Tuple[float, float]]
+
+
+@dataclass
+class _AtlasLayout:
+    # Running wall length along the footprint ring, starting at 0
+    cumulative: np.ndarray
+    # Wall index bounds of each strip
+    bounds: np.ndarray
+    # Length (m) of the longest strip
+    strip_length: float
+    # One strip's size (px); the strips are stacked at the bottom of the atlas
+    strip_size: Tuple[int, int]
+    roof_size: Tuple[int, int]
+    wall_size: Tuple[int, int]
 
 
 @dataclass
@@ -27,66 +47,121 @@ class UVMetadata:
 
 
 class UVGenerator:
-    def __init__(self, texel_density: float = 512.0):
+    def __init__(self, texel_density: float = 512.0, strip_segments: int = 32):
         self.texel_density = texel_density
+        # Footprints with more walls than this are split over several stacked strips
+        self.strip_segments = strip_segments
 
     def wall_strip_dimensions(self, perimeter: float, height: float) -> Tuple[int, int]:
         width_px = max(int(perimeter * self.texel_density), 16)
         height_px = max(int(height * self.texel_density), 16)
         return width_px, height_px
 
+    def roof_dimensions(self, extent_x: float, extent_y: float) -> Tuple[int, int]:
+        return max(int(extent_x * self.texel_density), 16), max(int(extent_y * self.texel_density), 16)
+
+    def _strip_layout(self, cumulative: np.ndarray, height: float) -> Tuple[np.ndarray, float]:
+        """Split the walls into consecutive runs, one per strip.
+
+        Returns the segment index bounds of each strip and the longest strip's
+        length. The strip count comes from ``strip_segments`` but is reduced until
+        the atlas stays at least as wide as it is tall.
+        """
+
+        segments = len(cumulative) - 1
+        strips = max(1, segments // self.strip_segments)
+        while True:
+            sizes = [len(part) for part in np.array_split(np.arange(segments), strips)]
+            bounds = np.concatenate(([0], np.cumsum(sizes)))
+            strip_length = float(np.diff(cumulative[bounds]).max())
+            if strips == 1 or strip_length >= strips * height:
+                return bounds, strip_length
+            strips -= 1
+
+    def _layout(self, polygon: Polygon, height: float) -> _AtlasLayout:
+        # Same corners extrude_building walls are built from (plan view, no degenerate edges)
+        ring = footprint_ring(polygon)
+        diffs = np.roll(ring, -1, axis=0) - ring
+        lengths = np.hypot(diffs[:, 0], diffs[:, 1])
+        cumulative = np.concatenate(([0.0], np.cumsum(lengths)))
+        bounds, strip_length = self._strip_layout(cumulative, height)
+        strips = len(bounds) - 1
+        width_px, height_px = self.wall_strip_dimensions(strip_length, height)
+        # The roof has no texture of its own: it samples a region kept blank in the
+        # facade masks on top of the strips, at the same texel density as the walls
+        minx, miny, maxx, maxy = polygon.bounds
+        roof_size = self.roof_dimensions(maxx - minx, maxy - miny)
+        return _AtlasLayout(
+            cumulative=cumulative,
+            bounds=bounds,
+            strip_length=strip_length,
+            strip_size=(width_px, height_px),
+            roof_size=roof_size,
+            wall_size=(max(width_px, roof_size[0]), strips * height_px + roof_size[1]),
+        )
+
+    def atlas_layout(self, polygon: Polygon, height: float) -> Tuple[Tuple[int, int], int]:
+        """Wall atlas size and strip count :meth:`map_wall_uvs` gives a footprint, without the UVs."""
+        layout = self._layout(polygon, height)
+        return layout.wall_size, len(layout.bounds) - 1
+
     def map_wall_uvs(self, polygon: Polygon, mesh: Mesh) -> UVAtlas:
-        exterior = list(polygon.exterior.coords)
-        lengths = [np.linalg.norm(np.array(exterior[i + 1]) - np.array(exterior[i])) for i in range(len(exterior) - 1)]
-        perimeter = float(sum(lengths))
-        height = float(max(v[2] for v in mesh.vertices))
-        width_px, height_px = self.wall_strip_dimensions(perimeter, height)
-
-        wall_uvs: List[Tuple[float, float]] = []
-        cumulative = 0.0
-        for segment_length in lengths:
-            x0 = cumulative / perimeter
-            x1 = (cumulative + segment_length) / perimeter
-            cumulative += segment_length
-            wall_uvs.extend(
-                [
-                    (x0, 0.0),
-                    (x1, 0.0),
-                    (x1, 1.0),
-                    (x0, 1.0),
-                ]
-            )
-        roof_uvs = [(0.5, 0.5) for _ in range(len(mesh.vertices))]
+        layout = self._layout(polygon, float(mesh.vertices[:, 2].max()))
+        cumulative, bounds, strip_length = layout.cumulative, layout.bounds, layout.strip_length
+        strips = len(bounds) - 1
+        atlas_width, atlas_height = layout.wall_size
+        walls_u = layout.strip_size[0] / atlas_width
+        walls_v = strips * layout.strip_size[1] / atlas_height
+
+        # Four corners per wall: (x0, v0), (x1, v0), (x1, v1), (x0, v1), with u measured
+        # from the start of the wall's strip and v spanning that strip's band
+        strip = np.repeat(np.arange(strips), np.diff(bounds))
+        start = cumulative[bounds[:-1]][strip]
+        x0 = (cumulative[:-1] - start) / strip_length * walls_u
+        x1 = (cumulative[1:] - start) / strip_length * walls_u
+        v0, v1 = strip / strips * walls_v, (strip + 1) / strips * walls_v
+        wall_uvs = np.empty((4 * len(x0), 2), dtype=np.float32)
+        wall_uvs[0::4, 0] = wall_uvs[3::4, 0] = x0
+        wall_uvs[1::4, 0] = wall_uvs[2::4, 0] = x1
+        wall_uvs[0::4, 1] = wall_uvs[1::4, 1] = v0
+        wall_uvs[2::4, 1] = wall_uvs[3::4, 1] = v1
+        # Roof: planar projection of every vertex into the footprint's bounding box,
+        # scaled into the roof region
+        minx, miny, maxx, maxy = polygon.bounds
+        spans = np.array([maxx - minx, maxy - miny])
+        planar = (mesh.vertices[:, :2] - (minx, miny)) / np.where(spans > 0, spans, 1.0)
+        planar[:, 0] *= layout.roof_size[0] / atlas_width
+        planar[:, 1] = walls_v + planar[:, 1] * (1.0 - walls_v)
+        roof_uvs = planar.astype(np.float32)
         return UVAtlas(
-            wall_size=(width_px, height_px),
-            roof_size=(max(width_px // 2, 16), max(height_px // 2, 16)),
+            wall_size=layout.wall_size,
             wall_uvs=wall_uvs,
             roof_uvs=roof_uvs,
+            wall_segments=len(x0),
+            wall_strips=strips,
+            roof_size=layout.roof_size,
         )
 
     def annotate_mesh_uvs(self, mesh: Mesh, atlas: UVAtlas) -> Mesh:
-        mesh.uvs = atlas.wall_uvs + atlas.roof_uvs
-        # Rebuild uv_indices to align with uv list
-        mesh.uv_indices = []
-        wall_face_counts: Dict[int, int] = defaultdict(int)
-        roof_offset = len(atlas.wall_uvs)
-        roof_cursor = 0
-
-        for label in mesh.face_labels:
-            if label.startswith("wall"):
-                wall_idx = int(label.split("_")[1])
-                face_number = wall_face_counts[wall_idx]
-                base = wall_idx * 4
-                if face_number == 0:
-                    indices = (base, base + 1, base + 2)
-                else:
-                    indices = (base, base + 2, base + 3)
-                wall_face_counts[wall_idx] += 1
-                mesh.uv_indices.append(indices)
-            else:
-                indices = (roof_offset + roof_cursor, roof_offset + roof_cursor + 1, roof_offset + roof_cursor + 2)
-                mesh.uv_indices.append(indices)
-                roof_cursor += 3
-        return mesh
-
-
+        # roof_uvs holds one UV per mesh vertex, so roof faces index it by vertex id
+        roof_offset = 4 * atlas.wall_segments
+        uv_indices = np.asarray(mesh.faces, dtype=np.int32).reshape(-1, 3) + roof_offset
+
+        # Parse each distinct label once ("wall_<i>" -> i, anything else -> -1)
+        label_walls = {
+            label: int(label.split("_")[1]) if label.startswith("wall") else -1 for label in set(mesh.face_labels)
+        }
+        wall_idx = np.fromiter(
+            map(label_walls.__getitem__, mesh.face_labels), dtype=np.int32, count=len(mesh.face_labels)
+        )
+        wall_faces = np.flatnonzero(wall_idx >= 0)
+        if wall_faces.size:
+            # Each wall quad is two triangles: the first one seen takes corners
+            # (0, 1, 2) of the wall's four UVs, any later one takes (0, 2, 3).
+            walls = wall_idx[wall_faces]
+            _, first = np.unique(walls, return_index=True)
+            is_first = np.zeros(wall_faces.size, dtype=bool)
+            is_first[first] = True
+            corners = np.where(is_first[:, None], np.array([0, 1, 2]), np.array([0, 2, 3]))
+            uv_indices[wall_faces] = walls[:, None] * 4 + corners
+        return replace(mesh, uvs=np.vstack([atlas.wall_uvs, atlas.roof_uvs]), uv_indices=uv_indices)
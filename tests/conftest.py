@@ -1,6 +1,53 @@
 import sys
 from pathlib import Path
 
+import pytest
+
 ROOT = Path(__file__).resolve().parents[1]
 if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
+
+
+@pytest.fixture(scope="module")
+def outdir(tmp_path_factory) -> Path:
+    """Output directory shared by the tests of one module; use a per-test subdirectory."""
+    return tmp_path_factory.mktemp("genbuilder")
+
+
+# name -> (exterior ring, floors_count, floor_height)
+FOOTPRINTS = {
+    "square": ([(0, 0), (10, 0), (10, 10), (0, 10)], 2, 3.0),
+    "l_shape": ([(0, 0), (10, 0), (10, 5), (5, 5), (5, 10), (0, 10)], 1, 3.0),
+}
+
+
+def _build_uvs(polygon, props, **generator_kwargs):
+    """Extrude ``polygon`` and map its UVs; returns the annotated mesh and its atlas."""
+    from genbuilder.geometry import extrude_building
+    from genbuilder.uv import UVGenerator
+
+    mesh = extrude_building(polygon, props)
+    generator = UVGenerator(**{"texel_density": 10, **generator_kwargs})
+    atlas = generator.map_wall_uvs(polygon, mesh)
+    return generator.annotate_mesh_uvs(mesh, atlas), atlas
+
+
+@pytest.fixture(scope="session")
+def build_uvs():
+    """``build_uvs(polygon, props, **generator_kwargs) -> (mesh, atlas)`` for tests with their own footprint."""
+    return _build_uvs
+
+
+@pytest.fixture(scope="module", params=sorted(FOOTPRINTS))
+def footprint_uvs(request):
+    """Extruded and UV-annotated footprint as ``(polygon, mesh, atlas)``, built once per module."""
+    from shapely.geometry import Polygon
+
+    from genbuilder.geometry import BuildingProperties
+
+    ring, floors_count, floor_height = FOOTPRINTS[request.param]
+    polygon = Polygon(ring)
+    props = BuildingProperties(
+        floors_count=floors_count, floor_height=floor_height, building_height=floors_count * floor_height
+    )
+    return (polygon, *_build_uvs(polygon, props))
@@ -0,0 +1,39 @@
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+
+def _triangles(positions: np.ndarray, uvs: np.ndarray) -> list:
+    """Sorted (position, uv) triangles, each rotated to start at its smallest corner (winding kept)."""
+    corners = np.round(np.concatenate([positions, uvs], axis=2), 5)
+    triangles = []
+    for triangle in corners.tolist():
+        start = triangle.index(min(triangle))
+        triangles.append(tuple(map(tuple, triangle[start:] + triangle[:start])))
+    return sorted(triangles)
+
+
+@pytest.mark.parametrize("optimize", [False, True])
+def test_exported_corners_keep_their_uvs(footprint_uvs, outdir: Path, request, optimize):
+    import trimesh
+    from PIL import Image
+
+    from genbuilder.exporter import export_glb
+
+    if optimize:
+        pytest.importorskip("meshoptimizer")
+    _, mesh, _ = footprint_uvs
+    output_dir = outdir / request.node.name
+    output_dir.mkdir()
+    base_color = output_dir / "base_color.png"
+    Image.new("RGB", (8, 8)).save(base_color)
+
+    export = export_glb(mesh, {"baseColor": base_color}, output_dir / "building.glb", optimize=optimize)
+    exported = trimesh.load(export.glb_path, force="mesh", process=False)
+
+    # Seams are split per (vertex, UV) corner, so every wall and roof triangle
+    # must come back with the positions and UVs the mesh assigned its corners
+    expected = _triangles(mesh.vertices[mesh.faces], mesh.uvs[mesh.uv_indices])
+    actual = _triangles(exported.vertices[exported.faces], exported.visual.uv[exported.faces])
+    assert actual == expected
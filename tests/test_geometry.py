@@ -0,0 +1,28 @@
+import numpy as np
+
+
+def _triangle_areas(vertices: np.ndarray, faces: np.ndarray) -> np.ndarray:
+    a, b, c = (vertices[faces[:, k]] for k in range(3))
+    return 0.5 * np.linalg.norm(np.cross(b - a, c - a), axis=1)
+
+
+def test_roof_covers_non_convex_footprint():
+    from shapely.geometry import Polygon
+
+    from genbuilder.geometry import BuildingProperties, extrude_building
+
+    # A fan around the first corner would spill outside this L-shaped footprint
+    polygon = Polygon([(10, 0), (10, 5), (5, 5), (5, 10), (0, 10), (0, 0)])
+    props = BuildingProperties(floors_count=2, floor_height=3.0, building_height=6.0)
+    mesh = extrude_building(polygon, props)
+
+    # Walls and roof share one bottom and one top vertex per corner
+    assert len(mesh.vertices) == 2 * (len(polygon.exterior.coords) - 1)
+
+    roof = np.array([label == "roof" for label in mesh.face_labels])
+    assert roof.sum() == len(polygon.exterior.coords) - 3
+    assert np.isclose(_triangle_areas(mesh.vertices, mesh.faces[roof]).sum(), polygon.area)
+
+    roof_uvs = mesh.uvs[np.unique(mesh.uv_indices[roof])]
+    assert roof_uvs.min() == 0.0
+    assert roof_uvs.max() == 1.0
@@ -0,0 +1,96 @@
+import json
+import multiprocessing
+from pathlib import Path
+
+import pytest
+
+
+def _square(x0: float, y0: float, size: float = 0.0002):
+    return [[x0, y0], [x0 + size, y0], [x0 + size, y0 + size], [x0, y0 + size], [x0, y0]]
+
+
+def _feature(feature_id: str, geometry: dict, floors_count: int = 2) -> dict:
+    properties = {"floors_count": floors_count, "floor_height": 3.0}
+    return {"type": "Feature", "id": feature_id, "geometry": geometry, "properties": properties}
+
+
+FEATURES = [
+    _feature("a", {"type": "Polygon", "coordinates": [_square(30.0, 59.9)]}),
+    _feature("b", {"type": "Polygon", "coordinates": [_square(30.001, 59.9, 0.0003)]}, floors_count=3),
+    _feature("broken", {"type": "Point", "coordinates": [30.002, 59.9]}),
+    # Properties that are not a mapping only fail this feature
+    {**_feature("bad_properties", {"type": "Polygon", "coordinates": [_square(30.005, 59.9)]}), "properties": "tall"},
+    # Same footprint as "a", translated: reuses its mesh and textures
+    _feature("a_copy", {"type": "Polygon", "coordinates": [_square(30.003, 59.9)]}),
+    _feature("c", {"type": "Polygon", "coordinates": [_square(30.004, 59.9, 0.0001)]}, floors_count=1),
+]
+
+
+@pytest.fixture
+def stub_textures(monkeypatch, tmp_path):
+    """Skip the model download and diffusion: every facade gets the same flat texture."""
+    from PIL import Image
+
+    from genbuilder import texture
+    from genbuilder.texture import TextureGenerator, TextureResult
+
+    base_color = tmp_path / "base_color.png"
+    Image.new("RGB", (32, 32), (120, 130, 140)).save(base_color)
+
+    def synthesize_facade(self, wall_size, masks, metadata, dry_run=False):
+        return TextureResult(base_color=base_color, roughness=None, normal=None)
+
+    monkeypatch.setattr(texture, "ensure_sd15_controlnet", lambda model_root: (model_root, model_root))
+    monkeypatch.setattr(TextureGenerator, "synthesize_facade", synthesize_facade)
+
+
+def _run(source: Path, output_dir: Path, cache_dir: Path, workers: int) -> list:
+    from genbuilder.geo_pipeline import BuildingPipeline
+    from genbuilder.params import GenParams
+
+    params = GenParams(workers=workers, texel_density=16, cache_dir=cache_dir)
+    index_path = BuildingPipeline(params=params).run(source, output_dir)
+    records = json.loads(index_path.read_text())
+    for record in records:
+        assert Path(record["glb"]).exists()
+        # Only the output directory differs between runs
+        record["glb"] = Path(record["glb"]).name
+    return records
+
+
+def test_shape_keys_separate_atlas_layouts(stub_textures, tmp_path):
+    import numpy as np
+
+    from genbuilder.geo_pipeline import BuildingPipeline
+    from genbuilder.params import GenParams
+
+    # A 64-corner footprint is split into two strips; the square around it keeps one
+    angles = np.linspace(0, 2 * np.pi, 64, endpoint=False)
+    ring = np.column_stack([30.0 + 0.0002 * np.cos(angles), 59.9 + 0.0001 * np.sin(angles)])
+    minx, miny = ring.min(axis=0)
+    maxx, maxy = ring.max(axis=0)
+    square = [[minx, miny], [maxx, miny], [maxx, maxy], [minx, maxy], [minx, miny]]
+    features = [
+        _feature("round", {"type": "Polygon", "coordinates": [ring.tolist() + [ring[0].tolist()]]}),
+        _feature("square", {"type": "Polygon", "coordinates": [square]}),
+    ]
+
+    pipeline = BuildingPipeline(params=GenParams(texel_density=16, cache_dir=tmp_path / "cache"))
+    keys = [pipeline._feature_shape_key(feature) for feature in features]
+    assert [key[-1] for key in keys] == [2, 1]
+    assert keys[0] != keys[1]
+    assert pipeline._shape_keys(features) == keys
+
+
+@pytest.mark.skipif(
+    multiprocessing.get_start_method() != "fork", reason="stubs only reach workers forked from the test process"
+)
+def test_parallel_run_matches_sequential(stub_textures, tmp_path):
+    source = tmp_path / "buildings.geojson"
+    source.write_text(json.dumps({"type": "FeatureCollection", "features": FEATURES}))
+
+    sequential = _run(source, tmp_path / "sequential", tmp_path / "cache", workers=1)
+    parallel = _run(source, tmp_path / "parallel", tmp_path / "cache", workers=2)
+
+    assert [record["id"] for record in sequential] == ["a", "b", "a_copy", "c"]
+    assert parallel == sequential
@@ -1,21 +1,43 @@
 from pathlib import Path
 
-from PIL import Image
+import numpy as np
 
-from genbuilder.segmentation import SegmentationGenerator
 
+def test_segmentation_masks(outdir: Path, request):
+    from PIL import Image
+
+    from genbuilder.segmentation import SegmentationGenerator
 
-def test_segmentation_masks(tmp_path: Path):
     generator = SegmentationGenerator(texel_density=10)
     masks = generator.generate(
         wall_size=(200, 300),
         properties={"floors_count": 3, "floor_height": 3.0},
-        output_dir=tmp_path,
+        output_dir=outdir / request.node.name,
     )
 
     for mask_path in [masks.plinth, masks.floors, masks.openings]:
         assert mask_path.exists()
 
-    plinth_img = Image.open(masks.plinth)
-    pixels = plinth_img.getdata()
-    assert sum(pixels) > 0
+    assert np.asarray(Image.open(masks.plinth)).any()
+
+
+def test_stacked_strips_repeat_one_band_from_the_bottom(outdir: Path, request):
+    from PIL import Image
+
+    from genbuilder.segmentation import SegmentationGenerator
+
+    generator = SegmentationGenerator(texel_density=10)
+    properties = {"floors_count": 3, "floor_height": 3.0}
+    band = generator.generate((120, 96), properties, outdir / request.node.name / "band")
+    # Three 96-row bands plus two leftover rows, which stay blank at the top
+    stacked = generator.generate((120, 290), properties, outdir / request.node.name / "stacked", strips=3)
+
+    for band_path, stacked_path in zip(
+        [band.plinth, band.floors, band.openings], [stacked.plinth, stacked.floors, stacked.openings]
+    ):
+        expected = np.asarray(Image.open(band_path))
+        mask = np.asarray(Image.open(stacked_path))
+        assert not mask[:2].any()
+        # Strip s covers v in [s / strips, (s + 1) / strips], i.e. counting up from the bottom row
+        for strip in range(3):
+            assert np.array_equal(mask[290 - (strip + 1) * 96 : 290 - strip * 96], expected)
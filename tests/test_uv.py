@@ -1,20 +1,13 @@
-from shapely.geometry import Polygon
+import numpy as np
 
-from genbuilder.geometry import BuildingProperties, extrude_building
-from genbuilder.uv import UVGenerator
 
-
-def test_wall_strip_dimensions_and_uv_ordering():
-    polygon = Polygon([(0, 0), (10, 0), (10, 10), (0, 10)])
-    props = BuildingProperties(floors_count=2, floor_height=3.0, building_height=6.0)
-    mesh = extrude_building(polygon, props)
-
-    generator = UVGenerator(texel_density=10)
-    atlas = generator.map_wall_uvs(polygon, mesh)
+def test_wall_strip_dimensions_and_uv_ordering(footprint_uvs):
+    polygon, mesh, atlas = footprint_uvs
     assert atlas.wall_size[0] > atlas.wall_size[1]
 
     # UV continuity around perimeter
     expected_segments = len(polygon.exterior.coords) - 1
+    assert atlas.wall_segments == expected_segments
     assert len(atlas.wall_uvs) == expected_segments * 4
     # first and last U coordinates should align to form loop
     first_u = atlas.wall_uvs[0][0]
@@ -22,27 +15,81 @@ def test_wall_strip_dimensions_and_uv_ordering():
     assert first_u == 0.0
     assert 0.0 <= last_u <= 1.0
 
-    mesh = generator.annotate_mesh_uvs(mesh, atlas)
-    assert mesh.uvs, "Mesh should have UVs assigned"
-
+    assert len(mesh.uvs), "Mesh should have UVs assigned"
 
-def test_uv_indices_align_with_wall_segments():
-    polygon = Polygon([(0, 0), (10, 0), (10, 5), (5, 5), (5, 10), (0, 10)])
-    props = BuildingProperties(floors_count=1, floor_height=3.0, building_height=3.0)
-    mesh = extrude_building(polygon, props)
 
-    generator = UVGenerator(texel_density=10)
-    atlas = generator.map_wall_uvs(polygon, mesh)
-    mesh = generator.annotate_mesh_uvs(mesh, atlas)
+def test_uv_indices_align_with_wall_segments(footprint_uvs):
+    polygon, mesh, atlas = footprint_uvs
 
     segments = len(polygon.exterior.coords) - 1
     for wall_idx in range(segments):
         base = wall_idx * 4
-        assert mesh.uv_indices[2 * wall_idx] == (base, base + 1, base + 2)
-        assert mesh.uv_indices[2 * wall_idx + 1] == (base, base + 2, base + 3)
+        assert tuple(mesh.uv_indices[2 * wall_idx]) == (base, base + 1, base + 2)
+        assert tuple(mesh.uv_indices[2 * wall_idx + 1]) == (base, base + 2, base + 3)
 
     wall_uvs = len(atlas.wall_uvs)
     roof_indices = mesh.uv_indices[2 * segments :]
     for face_indices in roof_indices:
         assert all(idx >= wall_uvs for idx in face_indices)
     assert max(max(face) for face in mesh.uv_indices) < len(mesh.uvs)
+
+
+def test_roof_uvs_are_planar_projection(build_uvs):
+    from shapely.geometry import Polygon
+
+    from genbuilder.geometry import BuildingProperties
+
+    polygon = Polygon([(0, 0), (20, 0), (20, 10), (0, 10)])
+    props = BuildingProperties(floors_count=1, floor_height=3.0, building_height=3.0)
+    mesh, atlas = build_uvs(polygon, props)
+    # 30 px facade band with the 200 x 100 px roof region (10 px per metre) on top of it
+    assert atlas.roof_size == (200, 100)
+    assert atlas.wall_size == (600, 130)
+
+    roof = [idx for idx, label in enumerate(mesh.face_labels) if label == "roof"]
+    for face_idx in roof:
+        for vertex, uv_idx in zip(mesh.faces[face_idx], mesh.uv_indices[face_idx]):
+            x, y, _ = mesh.vertices[vertex]
+            assert np.allclose(mesh.uvs[uv_idx], (x * 10 / 600, (30 + y * 10) / 130))
+    assert atlas.wall_uvs[:, 1].max() <= atlas.roof_uvs[:, 1].min()
+
+
+def test_repeated_vertices_add_no_walls(build_uvs):
+    from shapely.geometry import Polygon
+
+    from genbuilder.geometry import BuildingProperties
+
+    polygon = Polygon([(0, 0), (10, 0), (10, 0), (10, 10), (0, 10)])
+    props = BuildingProperties(floors_count=1, floor_height=3.0, building_height=3.0)
+    mesh, atlas = build_uvs(polygon, props)
+
+    assert atlas.wall_segments == 4
+    assert sum(label.startswith("wall") for label in mesh.face_labels) == 2 * atlas.wall_segments
+    assert max(max(face) for face in mesh.uv_indices) < len(mesh.uvs)
+
+
+def test_many_walls_are_split_into_stacked_strips(build_uvs):
+    from shapely.geometry import Polygon
+
+    from genbuilder.geometry import BuildingProperties
+
+    angles = np.linspace(0, 2 * np.pi, 200, endpoint=False)
+    polygon = Polygon(np.column_stack([60 * np.cos(angles), 30 * np.sin(angles)]))
+    props = BuildingProperties(floors_count=3, floor_height=3.0, building_height=9.0)
+    _, atlas = build_uvs(polygon, props)
+    assert atlas.wall_strips > 1
+    walls_px = atlas.wall_size[1] - atlas.roof_size[1]
+    assert atlas.wall_size[0] >= walls_px
+
+    # Each wall stays inside one strip's band and keeps the wall texel density along u
+    width_px = atlas.wall_size[0]
+    v = atlas.wall_uvs[:, 1].reshape(-1, 4)
+    assert np.allclose(v[:, 2] - v[:, 0], walls_px / atlas.wall_size[1] / atlas.wall_strips)
+    u = atlas.wall_uvs[:, 0].reshape(-1, 4)
+    lengths = np.hypot(*np.diff(np.asarray(polygon.exterior.coords), axis=0).T)
+    assert np.allclose((u[:, 1] - u[:, 0]) * width_px / lengths, 10, rtol=1e-2)
+    assert atlas.wall_uvs[:, 0].min() == 0.0
+
+    # The 120 x 60 m roof is wider than any strip and spans the atlas at the same density
+    assert atlas.roof_size == (1200, 600)
+    assert np.isclose(atlas.roof_uvs[:, 0].max() * width_px, 1200)